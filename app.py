@@ -1,15 +1,26 @@
 import pandas as pd
 import numpy as np
-from flask import Flask, request, jsonify, send_file
+from pandas.api.types import infer_dtype
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import gzip
+import sqlite3
+import json
 import uuid
+import time
+import hashlib
+import threading
 from datetime import datetime, timedelta
 import jwt
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 from flask_cors import CORS
+from cachetools import TTLCache
 
 app = Flask(__name__)
 CORS(app)
@@ -19,17 +30,46 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your-secret-key'
 app.config['UPLOAD_FOLDER'] = 'uploads/'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+app.config['PASSWORD_HASH_METHOD'] = 'scrypt:32768:8:1'  # n, r, p; don't lower
+app.config['CHUNKED_THRESHOLD'] = 4 * 1024 * 1024  # CSVs above this are processed in chunks
+app.config['UPLOAD_PROCESSING_TIMEOUT'] = 5 * 60  # seconds before a stuck analysis counts as failed
 
 db = SQLAlchemy(app)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Parsed uploads waiting for /clean, keyed by file_id
+_DF_CACHE = TTLCache(maxsize=128, ttl=900)
+_DF_CACHE_LOCK = threading.Lock()
+
+# Parses and analyzes uploads off the request thread
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+_JWT = jwt.PyJWT()
+_DECODE_OPTS = {'algorithms': ["HS256"], 'options': {'require': ["exp", "user_id"]}}
+
+# Decoded token claims keyed by token hash, so repeat requests skip jwt.decode
+_TOKEN_CACHE = TTLCache(maxsize=10000, ttl=30)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
 # =========================
 # Database Models
 # =========================
 
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer; NORMAL syncs at checkpoints only
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password = db.Column(db.String(255), nullable=False)
     subscription = db.Column(db.String(20), default='free')
     files_cleaned = db.Column(db.Integer, default=0)
@@ -37,6 +77,11 @@ class User(db.Model):
 
 
 class CleaningJob(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_user_created', 'user_id', 'created_at'),
+        db.Index('ix_job_user_cleanedfn', 'user_id', 'cleaned_filename'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     original_filename = db.Column(db.String(255))
@@ -59,19 +104,35 @@ def token_required(f):
             return jsonify({'error': 'Token missing'}), 401
 
         if token.startswith("Bearer "):
-            token = token.split(" ")[1]
-
-        try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data['user_id'])
+            token = token[7:]
+
+        key = hashlib.sha256(token.encode()).digest()
+        with _TOKEN_CACHE_LOCK:
+            claims = _TOKEN_CACHE.get(key)
+
+        if claims is None:
+            try:
+                data = _JWT.decode(token, app.config['SECRET_KEY'], **_DECODE_OPTS)
+            except jwt.ExpiredSignatureError:
+                return jsonify({'error': 'Token expired'}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({'error': 'Invalid token'}), 401
+
+            claims = (data['user_id'], data['exp'])
+            with _TOKEN_CACHE_LOCK:
+                _TOKEN_CACHE[key] = claims
+
+        user_id, exp = claims
+        if exp <= time.time():
+            return jsonify({'error': 'Token expired'}), 401
 
-            if not current_user:
-                return jsonify({'error': 'User not found'}), 401
+        # Only the columns routes read; the user is always loaded fresh
+        current_user = db.session.query(
+            User.id, User.subscription, User.files_cleaned
+        ).filter(User.id == user_id).first()
 
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token'}), 401
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 401
 
         return f(current_user, *args, **kwargs)
 
@@ -82,15 +143,57 @@ def token_required(f):
 # Data Cleaning Class
 # =========================
 
+def _read_excel(path):
+    # calamine (Rust) is much faster than openpyxl; older pandas or a missing
+    # python-calamine raise here, so fall back to the default engine
+    try:
+        return pd.read_excel(path, engine='calamine')
+    except (ImportError, ValueError):
+        return pd.read_excel(path)
+
+
+_NUMERIC_DTYPES = ['int64', 'float64', 'Int64', 'Float64']
+
+
+def _strip_text(series):
+    # A column holding only str values needs no astype(str) copy
+    if infer_dtype(series, skipna=False) == 'string':
+        s = series
+    else:
+        s = series.astype(str)
+    # One Python walk that stops at the first value needing work; clean
+    # columns, the common case, come back without a copy
+    values = s.to_numpy()
+    if not any('\xa0' in x or x != x.strip() for x in values):
+        return s
+    # NBSPs are always normalized so a cell's result never depends on its
+    # neighbours; the join checks the rest of the column at C speed
+    if '\xa0' in ''.join(values):
+        s = s.str.replace('\xa0', ' ', regex=False)
+    # No argument, so every Unicode whitespace character is trimmed
+    return s.str.strip()
+
+
 class DataCleaner:
     def __init__(self, df):
         self.df = df
         self.changes = []
+        self._dup_mask = None
+
+    @classmethod
+    def from_chunks(cls, path, chunksize=100_000, **read_kwargs):
+        return ChunkedDataCleaner(path, chunksize, **read_kwargs)
+
+    def _duplicate_mask(self):
+        # Computed once and shared by analyze and auto_fix
+        if self._dup_mask is None:
+            self._dup_mask = self.df.duplicated().to_numpy()
+        return self._dup_mask
 
     def analyze(self):
         return {
             'empty_cells': int(self.df.isnull().sum().sum()),
-            'duplicate_rows': int(self.df.duplicated().sum()),
+            'duplicate_rows': int(self._duplicate_mask().sum()),
             'total_rows': len(self.df),
             'total_columns': len(self.df.columns)
         }
@@ -99,28 +202,36 @@ class DataCleaner:
         original_rows = len(self.df)
 
         # Remove duplicates
-        duplicates = self.df.duplicated().sum()
+        dup_mask = self._duplicate_mask()
+        duplicates = int(dup_mask.sum())
         if duplicates > 0:
-            self.df = self.df.drop_duplicates()
+            self.df = self.df[~dup_mask]
+            self._dup_mask = None
             self.changes.append(f"Removed {duplicates} duplicate rows")
 
-        # Trim text spaces
-        for col in self.df.select_dtypes(include=['object']).columns:
-            self.df[col] = self.df[col].astype(str).str.strip()
+        obj_cols = self.df.select_dtypes(include='object').columns.tolist()
+        num_cols = self.df.select_dtypes(include=_NUMERIC_DTYPES).columns.tolist()
+        other_cols = [c for c in self.df.columns if c not in obj_cols and c not in num_cols]
 
-        # Convert numeric text to numbers
-        for col in self.df.select_dtypes(include=['object']).columns:
-            converted = pd.to_numeric(self.df[col], errors='coerce')
-            if converted.notna().sum() > len(self.df) * 0.5:
-                self.df[col] = converted
+        # Trim text spaces, convert numeric text and fill missing in one pass
+        for col in obj_cols:
+            s = _strip_text(self.df[col])
+            converted = pd.to_numeric(s, errors='coerce', downcast='integer')
+            if converted.notna().sum() > len(s) * 0.5:
+                self.df[col] = converted.fillna(converted.median())
                 self.changes.append(f"Converted {col} to numeric")
+            else:
+                self.df[col] = s.where(self.df[col].notna(), "Unknown")
 
         # Fill missing values
-        for col in self.df.columns:
-            if self.df[col].dtype in ['int64', 'float64']:
-                self.df[col] = self.df[col].fillna(self.df[col].median())
-            else:
-                self.df[col] = self.df[col].fillna("Unknown")
+        if num_cols:
+            num = self.df[num_cols]
+            # A fractional median can't be stored in a nullable integer column
+            num = num.astype({c: 'Float64' for c in num_cols
+                              if num[c].dtype == 'Int64' and num[c].hasnans})
+            self.df[num_cols] = num.fillna(num.median())
+        if other_cols:
+            self.df[other_cols] = self.df[other_cols].fillna("Unknown")
 
         return {
             'rows_before': original_rows,
@@ -132,6 +243,167 @@ class DataCleaner:
         return self.df
 
 
+class ChunkedDataCleaner:
+    """Same cleaning as DataCleaner, but reads the CSV in chunks. Besides the
+    current chunk it keeps an 8-byte hash per unique row and the non-null
+    values of each numeric column as float64, so medians are exact.
+
+    One scan yields both the analysis and the fix plan; the plan can be saved
+    and passed back in so a later auto_fix only needs the write pass. The plan
+    lists the duplicate row positions, so the write pass drops exactly the
+    rows the analysis counted.
+
+    Rows are compared by hash only, not by value, since keeping earlier rows
+    to check would defeat the chunking. Two distinct rows that collide on 64
+    bits are treated as duplicates; for the ~1M rows a 16 MB upload can hold
+    that chance is below 1 in 10 million."""
+
+    def __init__(self, path, chunksize=100_000, dtype=None, parse_dates=None, plan=None):
+        self.path = path
+        self.chunksize = chunksize
+        self.dtype = dtype
+        self.parse_dates = parse_dates
+        self.plan = plan
+        self.changes = []
+
+    def _chunks(self):
+        return pd.read_csv(self.path, chunksize=self.chunksize,
+                           dtype=self.dtype, parse_dates=self.parse_dates)
+
+    @staticmethod
+    def _unique_rows(chunk, seen):
+        # seen is a sorted uint64 array of row hashes from earlier chunks, so
+        # duplicates are detected across chunk boundaries. Chunks infer types
+        # independently, so numbers are hashed as float64 and 5 matches 5.0
+        num_cols = chunk.select_dtypes(include='number').columns
+        normalized = chunk.astype({c: 'float64' for c in num_cols})
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        unique = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(seen):
+            pos = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+            unique &= seen[pos] != hashes
+        new = np.sort(hashes[unique])
+        return unique, np.insert(seen, np.searchsorted(seen, new), new)
+
+    def _scan(self):
+        empty_cells = total_rows = rows_after = total_columns = 0
+        seen = np.empty(0, dtype=np.uint64)
+        dtypes, obj_cols, num_cols = {}, [], []
+        numeric_counts, values, duplicates = {}, {}, []
+
+        for chunk in self._chunks():
+            empty_cells += int(chunk.isnull().sum().sum())
+            total_rows += len(chunk)
+            total_columns = len(chunk.columns)
+
+            # Chunks infer types independently; widen to a common type
+            for col, dtype in chunk.dtypes.astype(str).items():
+                prev = dtypes.setdefault(col, dtype)
+                if prev != dtype:
+                    numeric = {prev, dtype} <= {'int64', 'float64'}
+                    dtypes[col] = 'float64' if numeric else 'object'
+
+            unique, seen = self._unique_rows(chunk, seen)
+            duplicates += (np.flatnonzero(~unique) + total_rows - len(chunk)).tolist()
+            chunk = chunk[unique]
+            rows_after += len(chunk)
+
+            obj_cols += [c for c in chunk.select_dtypes(include='object').columns
+                         if c not in obj_cols]
+            num_cols += [c for c in chunk.select_dtypes(include=_NUMERIC_DTYPES).columns
+                         if c not in num_cols]
+
+            for col in chunk.columns:
+                if col in obj_cols:
+                    s = pd.to_numeric(_strip_text(chunk[col]), errors='coerce')
+                elif col in num_cols:
+                    s = chunk[col]
+                else:
+                    continue
+                numeric_counts[col] = numeric_counts.get(col, 0) + int(s.notna().sum())
+                values.setdefault(col, []).append(s.dropna().to_numpy(dtype='float64'))
+
+        converted = [c for c in obj_cols if numeric_counts.get(c, 0) > rows_after * 0.5]
+        medians = {}
+        for col in converted + [c for c in num_cols if c not in obj_cols]:
+            col_values = np.concatenate(values.pop(col, [np.empty(0)]))
+            medians[col] = float(np.median(col_values)) if len(col_values) else float('nan')
+
+        return {
+            'analysis': {
+                'empty_cells': empty_cells,
+                'duplicate_rows': total_rows - rows_after,
+                'total_rows': total_rows,
+                'total_columns': total_columns
+            },
+            'dtypes': dtypes,
+            'obj_cols': obj_cols,
+            'converted': converted,
+            'medians': medians,
+            'duplicates': duplicates
+        }
+
+    def analyze(self):
+        if self.plan is None:
+            self.plan = self._scan()
+        return self.plan['analysis']
+
+    def auto_fix(self, output_path=None, compression=None):
+        analysis = self.analyze()
+
+        if analysis['duplicate_rows'] > 0:
+            self.changes.append(f"Removed {analysis['duplicate_rows']} duplicate rows")
+        for col in self.plan['converted']:
+            self.changes.append(f"Converted {col} to numeric")
+
+        # Write pass: every chunk goes through one handle, so a gzipped
+        # output is a single gzip member rather than one per chunk
+        if output_path is not None:
+            opener = gzip.open if compression == 'gzip' else open
+            with opener(output_path, 'wt', newline='') as f:
+                header = True
+                for chunk in self.iter_cleaned():
+                    chunk.to_csv(f, header=header, index=False)
+                    header = False
+
+        return {
+            'rows_before': analysis['total_rows'],
+            'rows_after': analysis['total_rows'] - analysis['duplicate_rows'],
+            'changes': self.changes
+        }
+
+    def iter_cleaned(self):
+        """Yield cleaned chunks; auto_fix must have been called first."""
+        converted = set(self.plan['converted'])
+        obj_cols = set(self.plan['obj_cols'])
+        medians = self.plan['medians']
+        duplicates = np.asarray(self.plan['duplicates'], dtype=np.int64)
+        offset = 0
+
+        for chunk in self._chunks():
+            # Drop the rows the scan marked as duplicates rather than hashing
+            # again, since the write pass reads with the widened dtypes
+            lo, hi = np.searchsorted(duplicates, [offset, offset + len(chunk)])
+            unique = np.ones(len(chunk), dtype=bool)
+            unique[duplicates[lo:hi] - offset] = False
+            offset += len(chunk)
+            chunk = chunk[unique].copy()
+
+            for col in chunk.columns:
+                if col in converted:
+                    s = _strip_text(chunk[col])
+                    chunk[col] = pd.to_numeric(s, errors='coerce').fillna(medians[col])
+                elif col in obj_cols:
+                    s = _strip_text(chunk[col])
+                    chunk[col] = s.where(chunk[col].notna(), "Unknown")
+                elif col in medians:
+                    chunk[col] = chunk[col].fillna(medians[col])
+                else:
+                    chunk[col] = chunk[col].fillna("Unknown")
+
+            yield chunk
+
+
 # =========================
 # Auth Routes
 # =========================
@@ -143,7 +415,9 @@ def register():
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Email already exists'}), 400
 
-    hashed_password = generate_password_hash(data['password'])
+    hashed_password = generate_password_hash(
+        data['password'], method=app.config['PASSWORD_HASH_METHOD']
+    )
 
     new_user = User(
         email=data['email'],
@@ -153,7 +427,7 @@ def register():
     db.session.add(new_user)
     db.session.commit()
 
-    token = jwt.encode({
+    token = _JWT.encode({
         'user_id': new_user.id,
         'exp': datetime.utcnow() + timedelta(days=30)
     }, app.config['SECRET_KEY'], algorithm="HS256")
@@ -172,7 +446,7 @@ def login():
     if not user or not check_password_hash(user.password, data['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
 
-    token = jwt.encode({
+    token = _JWT.encode({
         'user_id': user.id,
         'exp': datetime.utcnow() + timedelta(days=30)
     }, app.config['SECRET_KEY'], algorithm="HS256")
@@ -187,6 +461,12 @@ def login():
     })
 
 
+def _preview(df, rows=5):
+    # to_json serializes in C and turns NaN into null, which jsonify would not
+    return json.loads(df.iloc[:rows].to_json(
+        orient='records', date_format='iso', double_precision=15))
+
+
 # =========================
 # Upload Route
 # =========================
@@ -219,62 +499,144 @@ def upload_file(current_user):
     filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     file.save(filepath)
 
+    _write_status(filename, user_id=current_user.id, status='processing')
+    _EXECUTOR.submit(_analyze_upload, filepath, filename, ext, current_user.id)
+
+    return jsonify({'file_id': filename, 'status': 'processing'}), 202
+
+
+def _status_path(file_id):
+    name, _ = os.path.splitext(os.path.join(app.config['UPLOAD_FOLDER'], file_id))
+    return f"{name}_temp.status.json"
+
+
+def _write_status(file_id, **status):
+    # Kept on disk next to the upload so any worker can answer a status poll
+    path = _status_path(file_id)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(status, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _read_status(file_id):
+    path = _status_path(file_id)
     try:
-        if ext == 'csv':
-            df = pd.read_csv(filepath)
+        with open(path) as f:
+            status = json.load(f)
+        age = time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+    # A worker that died mid-analysis never writes its final status
+    if status['status'] == 'processing' and age > app.config['UPLOAD_PROCESSING_TIMEOUT']:
+        status.update(status='error', error='Processing timed out')
+    return status
+
+
+def _analyze_upload(filepath, filename, ext, user_id):
+    # Restart the clock so time spent queued behind other uploads does not
+    # count toward UPLOAD_PROCESSING_TIMEOUT
+    _write_status(filename, user_id=user_id, status='processing')
+    try:
+        chunked = ext == 'csv' and os.path.getsize(filepath) > app.config['CHUNKED_THRESHOLD']
+
+        if chunked:
+            cleaner = DataCleaner.from_chunks(filepath)
+        elif ext == 'csv':
+            cleaner = DataCleaner(pd.read_csv(filepath))
         else:
-            df = pd.read_excel(filepath)
+            cleaner = DataCleaner(_read_excel(filepath))
+        analysis = cleaner.analyze()
+
+        name, _ = os.path.splitext(filepath)
+
+        if chunked:
+            # Saving the scan's plan lets /clean skip straight to the write pass
+            dtypes = cleaner.plan['dtypes']
+            with open(f"{name}_temp.plan.json", 'w') as f:
+                json.dump(cleaner.plan, f)
+            preview_df = pd.read_csv(filepath, nrows=5)
+        else:
+            # Keep the parsed frame for /clean; the column types are written to disk
+            # so another worker (or a cache miss) can re-read the upload without inference
+            df = cleaner.get_cleaned_data()
+            with _DF_CACHE_LOCK:
+                _DF_CACHE[filename] = df
+            dtypes = df.dtypes.astype(str).to_dict()
+            preview_df = df.head(5)
+
+        with open(f"{name}_temp.dtypes.json", 'w') as f:
+            json.dump(dtypes, f)
+
+        _write_status(filename, user_id=user_id, status='done',
+                      analysis=analysis, preview=_preview(preview_df))
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
+        _write_status(filename, user_id=user_id, status='error', error=str(e))
 
-    cleaner = DataCleaner(df)
-    analysis = cleaner.analyze()
 
-    # Save temp CSV
-    name, _ = os.path.splitext(filepath)
-    temp_path = f"{name}_temp.csv"
-    df.to_csv(temp_path, index=False)
+@app.route('/upload_status/<file_id>')
+@token_required
+def upload_status(current_user, file_id):
+    status = _read_status(file_id)
 
-    return jsonify({
-        'file_id': filename,
-        'analysis': analysis,
-        'preview': df.head(5).to_dict('records')
-    })
+    if not status or status.pop('user_id') != current_user.id:
+        return jsonify({'error': 'File expired or not found'}), 404
+
+    if status['status'] == 'error':
+        return jsonify({'error': status['error']}), 400
+
+    return jsonify({'file_id': file_id, **status})
 
 
 # =========================
 # Clean Route
 # =========================
 
-@app.route('/clean', methods=['POST'])
-@token_required
-def clean_file(current_user):
-    data = request.get_json()
-    file_id = data.get('file_id')
+def _open_upload(file_id):
+    """Return a cleaner for a pending upload, or None if it has expired."""
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
+    name, ext = os.path.splitext(filepath)
+    dtypes_path = f"{name}_temp.dtypes.json"
 
-    if not file_id:
-        return jsonify({'error': 'File ID required'}), 400
+    if not os.path.exists(dtypes_path):
+        return None
 
-    name, _ = os.path.splitext(os.path.join(app.config['UPLOAD_FOLDER'], file_id))
-    temp_path = f"{name}_temp.csv"
+    with _DF_CACHE_LOCK:
+        df = _DF_CACHE.pop(file_id, None)
 
-    if not os.path.exists(temp_path):
-        return jsonify({'error': 'File expired or not found'}), 404
+    if df is not None:
+        return DataCleaner(df)
 
-    df = pd.read_csv(temp_path)
+    if not os.path.exists(filepath):
+        return None
 
-    cleaner = DataCleaner(df)
-    analysis = cleaner.analyze()
-    fix_report = cleaner.auto_fix()
-    cleaned_df = cleaner.get_cleaned_data()
+    if ext.lower() != '.csv':
+        return DataCleaner(_read_excel(filepath))
 
-    cleaned_filename = f"cleaned_{file_id}"
-    cleaned_path = os.path.join(app.config['UPLOAD_FOLDER'], cleaned_filename)
+    dtypes, parse_dates = {}, []
+    with open(dtypes_path) as f:
+        for col, dtype in json.load(f).items():
+            if dtype.startswith('datetime'):
+                parse_dates.append(col)
+            else:
+                dtypes[col] = dtype
 
-    cleaned_df.to_csv(cleaned_path, index=False)
+    if os.path.getsize(filepath) > app.config['CHUNKED_THRESHOLD']:
+        plan = None
+        if os.path.exists(f"{name}_temp.plan.json"):
+            with open(f"{name}_temp.plan.json") as f:
+                plan = json.load(f)
+        return DataCleaner.from_chunks(filepath, dtype=dtypes, parse_dates=parse_dates,
+                                       plan=plan)
 
-    current_user.files_cleaned += 1
-    db.session.commit()
+    return DataCleaner(pd.read_csv(filepath, dtype=dtypes, parse_dates=parse_dates,
+                                   engine='c', low_memory=False))
+
+
+def _record_job(current_user, file_id, cleaned_filename, analysis, fix_report):
+    db.session.query(User).filter(User.id == current_user.id).update(
+        {User.files_cleaned: User.files_cleaned + 1}
+    )
 
     job = CleaningJob(
         user_id=current_user.id,
@@ -284,19 +646,102 @@ def clean_file(current_user):
         rows_cleaned=fix_report['rows_before'] - fix_report['rows_after']
     )
 
+    # Count and job land in one transaction
     db.session.add(job)
     db.session.commit()
 
-    os.remove(temp_path)
+    # The upload can only be cleaned once
+    name, _ = os.path.splitext(os.path.join(app.config['UPLOAD_FOLDER'], file_id))
+    os.remove(f"{name}_temp.dtypes.json")
+    for path in (f"{name}_temp.plan.json", _status_path(file_id)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@app.route('/clean', methods=['POST'])
+@token_required
+def clean_file(current_user):
+    data = request.get_json()
+    file_id = data.get('file_id')
+
+    if not file_id:
+        return jsonify({'error': 'File ID required'}), 400
+
+    status = _read_status(file_id)
+    if status and status['status'] == 'processing':
+        return jsonify({'error': 'File is still processing'}), 409
+
+    cleaner = _open_upload(file_id)
+
+    if cleaner is None:
+        return jsonify({'error': 'File expired or not found'}), 404
+
+    analysis = cleaner.analyze()
+
+    cleaned_filename = f"cleaned_{file_id}"
+    cleaned_path = os.path.join(app.config['UPLOAD_FOLDER'], cleaned_filename)
+
+    # Stored gzipped; /download serves it as-is to clients that accept gzip
+    if isinstance(cleaner, ChunkedDataCleaner):
+        fix_report = cleaner.auto_fix(cleaned_path, compression='gzip')
+        cleaned_df = pd.read_csv(cleaned_path, nrows=5, compression='gzip')
+    else:
+        fix_report = cleaner.auto_fix()
+        cleaned_df = cleaner.get_cleaned_data()
+        cleaned_df.to_csv(cleaned_path, index=False, compression='gzip')
+
+    _record_job(current_user, file_id, cleaned_filename, analysis, fix_report)
 
     return jsonify({
         'success': True,
         'download_url': f'/download/{cleaned_filename}',
         'report': fix_report,
-        'preview': cleaned_df.head(5).to_dict('records')
+        'preview': _preview(cleaned_df)
     })
 
 
+@app.route('/clean_and_download', methods=['POST'])
+@token_required
+def clean_and_download(current_user):
+    data = request.get_json()
+    file_id = data.get('file_id')
+
+    if not file_id:
+        return jsonify({'error': 'File ID required'}), 400
+
+    status = _read_status(file_id)
+    if status and status['status'] == 'processing':
+        return jsonify({'error': 'File is still processing'}), 409
+
+    cleaner = _open_upload(file_id)
+
+    if cleaner is None:
+        return jsonify({'error': 'File expired or not found'}), 404
+
+    analysis = cleaner.analyze()
+    fix_report = cleaner.auto_fix()
+
+    if isinstance(cleaner, ChunkedDataCleaner):
+        chunks = cleaner.iter_cleaned()
+    else:
+        cleaned_df = cleaner.get_cleaned_data()
+        chunks = (cleaned_df.iloc[i:i + 10000]
+                  for i in range(0, max(len(cleaned_df), 1), 10000))
+
+    # Nothing is written to disk, so the job has no downloadable file
+    _record_job(current_user, file_id, None, analysis, fix_report)
+
+    def generate():
+        header = True
+        for chunk in chunks:
+            yield chunk.to_csv(index=False, header=header)
+            header = False
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename=cleaned_{file_id}'
+    return response
+
+
 # =========================
 # Download Route
 # =========================
@@ -317,7 +762,22 @@ def download_file(current_user, filename):
     if not os.path.exists(path):
         return jsonify({'error': 'File not found'}), 404
 
-    return send_file(path, as_attachment=True)
+    with open(path, 'rb') as f:
+        gzipped = f.read(2) == b'\x1f\x8b'
+
+    # Files cleaned before gzip storage are plain CSV
+    if not gzipped:
+        return send_file(path, as_attachment=True)
+
+    if 'gzip' in request.accept_encodings:
+        response = send_file(path, as_attachment=True, download_name=filename,
+                             mimetype='text/csv')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    return send_file(gzip.open(path, 'rb'), as_attachment=True,
+                     download_name=filename, mimetype='text/csv')
 
 
 # =========================
@@ -353,4 +813,8 @@ if __name__ == '__main__':
     with app.app_context():
         db.create_all()
 
+        # create_all skips tables that already exist, so add any missing indexes
+        for index in CleaningJob.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
     app.run(debug=True, port=5000)
@@ -0,0 +1,86 @@
+import gzip
+import io
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # app creates its upload folder relative to the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import app
+    return app
+
+
+def test_gzipped_output_is_a_single_member(app_module, tmp_path):
+    source = tmp_path / 'big.csv'
+    pd.DataFrame({
+        'id': range(1000),
+        'name': [' x', 'y '] * 500,
+    }).to_csv(source, index=False)
+
+    output = tmp_path / 'cleaned.csv.gz'
+    cleaner = app_module.DataCleaner.from_chunks(str(source), chunksize=100)
+    report = cleaner.auto_fix(str(output), compression='gzip')
+
+    # A decoder that stops after the first member must still see every row
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    text = decoder.decompress(output.read_bytes())
+    assert decoder.unused_data == b''
+    assert len(text.splitlines()) == report['rows_after'] + 1
+    assert text == gzip.decompress(output.read_bytes())
+
+
+def _clean_both(app_module, source, tmp_path, chunksize=100):
+    in_memory = app_module.DataCleaner(pd.read_csv(source))
+    in_memory_analysis = in_memory.analyze()
+    in_memory_report = in_memory.auto_fix()
+
+    output = tmp_path / 'chunked.csv'
+    chunked = app_module.DataCleaner.from_chunks(str(source), chunksize=chunksize)
+    chunked_analysis = chunked.analyze()
+    # Reload with the saved dtypes and plan, as /clean does after an upload
+    chunked = app_module.ChunkedDataCleaner(str(source), chunksize,
+                                            dtype=chunked.plan['dtypes'],
+                                            plan=chunked.plan)
+    chunked_report = chunked.auto_fix(str(output))
+
+    assert chunked_analysis == in_memory_analysis
+    assert chunked_report == in_memory_report
+    return in_memory.get_cleaned_data(), pd.read_csv(output)
+
+
+def test_chunked_matches_in_memory_across_chunks(app_module, tmp_path):
+    # x is all ints in the first chunk; the second repeats row 5 and has a
+    # blank x, so it is read as float there and as float64 in the write pass
+    rows = [f"{i},v{i},{i * 0.5}" for i in range(100)]
+    rows += ["5,v5,2.5", ",v100,"]
+    rows += [f"{i},v{i}, {i * 1.5} " for i in range(101, 152)]
+    source = tmp_path / 'multi.csv'
+    source.write_text("x,name,amount\n" + "\n".join(rows) + "\n")
+
+    cleaned, written = _clean_both(app_module, source, tmp_path)
+
+    assert len(written) == 152
+    expected = pd.read_csv(io.StringIO(cleaned.to_csv(index=False)))
+    pd.testing.assert_frame_equal(written, expected)
+
+
+def test_chunked_medians_are_exact(app_module, tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'v': rng.integers(0, 450_000, 120_000).astype(float),
+        't': rng.integers(0, 300_000, 120_000).astype(str),
+    })
+    df.loc[::7, 'v'] = np.nan
+    df.loc[::11, 't'] = ''
+    source = tmp_path / 'medians.csv'
+    df.to_csv(source, index=False)
+
+    cleaned, written = _clean_both(app_module, source, tmp_path, chunksize=40_000)
+
+    assert written['v'].tolist() == cleaned['v'].tolist()
+    assert written['t'].tolist() == cleaned['t'].tolist()
@@ -0,0 +1,110 @@
+import os
+import time
+
+import pytest
+import sqlalchemy
+
+
+class _QueuedExecutor:
+    """Holds submitted jobs until the test runs them, so uploads stay processing."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+    def run_all(self):
+        while self.jobs:
+            fn, args = self.jobs.pop(0)
+            fn(*args)
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import app
+    monkeypatch.setitem(app.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    return app
+
+
+@pytest.fixture
+def client(app_module, tmp_path, monkeypatch):
+    # A throwaway database instead of the one in the instance folder
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with app_module.app.app_context():
+        monkeypatch.setitem(app_module.db._app_engines[app_module.app], None, engine)
+        app_module.db.create_all()
+    yield app_module.app.test_client()
+    engine.dispose()
+
+
+@pytest.fixture
+def executor(app_module, monkeypatch):
+    queued = _QueuedExecutor()
+    monkeypatch.setattr(app_module, '_EXECUTOR', queued)
+    return queued
+
+
+def _auth(client):
+    res = client.post('/register', json={'email': 'a@example.com', 'password': 'pw'})
+    return {'Authorization': f"Bearer {res.get_json()['token']}"}
+
+
+def _upload(client, headers, tmp_path):
+    source = tmp_path / 'data.csv'
+    source.write_text("a,b\n1, x\n1, x\n,y\n")
+    with open(source, 'rb') as f:
+        return client.post('/upload', headers=headers,
+                           data={'file': (f, 'data.csv')})
+
+
+def test_upload_status_then_clean(client, executor, tmp_path):
+    headers = _auth(client)
+
+    res = _upload(client, headers, tmp_path)
+    assert res.status_code == 202
+    file_id = res.get_json()['file_id']
+
+    res = client.get(f'/upload_status/{file_id}', headers=headers)
+    assert res.status_code == 200
+    assert res.get_json()['status'] == 'processing'
+
+    res = client.post('/clean', headers=headers, json={'file_id': file_id})
+    assert res.status_code == 409
+
+    executor.run_all()
+
+    res = client.get(f'/upload_status/{file_id}', headers=headers)
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body['status'] == 'done'
+    assert body['analysis']['duplicate_rows'] == 1
+
+    res = client.post('/clean', headers=headers, json={'file_id': file_id})
+    assert res.status_code == 200
+    assert res.get_json()['report']['rows_after'] == 2
+
+
+def test_stuck_processing_times_out(app_module, client, executor, tmp_path, monkeypatch):
+    headers = _auth(client)
+    file_id = _upload(client, headers, tmp_path).get_json()['file_id']
+
+    stale = time.time() - app_module.app.config['UPLOAD_PROCESSING_TIMEOUT'] - 1
+    os.utime(app_module._status_path(file_id), (stale, stale))
+
+    res = client.get(f'/upload_status/{file_id}', headers=headers)
+    assert res.status_code == 400
+    assert res.get_json()['error'] == 'Processing timed out'
+
+    # A job that was only queued starts its own clock when it runs
+    statuses = []
+    analyze = app_module.DataCleaner.analyze
+
+    def recording_analyze(self):
+        statuses.append(app_module._read_status(file_id)['status'])
+        return analyze(self)
+
+    monkeypatch.setattr(app_module.DataCleaner, 'analyze', recording_analyze)
+    executor.run_all()
+    assert statuses == ['processing']